@@ -1,14 +1,39 @@
 import os
 import sys
 from playwright.sync_api import sync_playwright
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 from pathlib import Path
 import re
 import base64
+import json
+import time
+import queue
+import asyncio
+import random
+import hashlib
+import threading
+import uuid
+import shutil
+import tempfile
+import contextlib
+import sqlite3
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+import zlib
+import functools
 import dash
 from dash import html, dcc, Input, Output, State
 import dash_bootstrap_components as dbc
 import requests
+try:
+    import httpx
+except ImportError:
+    httpx = None
+from flask import request, Response, jsonify
 from bs4 import BeautifulSoup
 from html2markdown import convert
 
@@ -21,37 +46,44 @@ app = dash.Dash(
 app.title = "LLMS Generator Toolkit"
 server = app.server
 
+RENDER_CHROMIUM_PATH = "/opt/render/.cache/ms-playwright/chromium-1105/chrome-linux/chrome"
+
 # Playwright configuration for Render
 if "RENDER" in os.environ:
     os.environ["PLAYWRIGHT_BROWSERS_PATH"] = "/opt/render/.cache/ms-playwright"
     os.makedirs(os.environ["PLAYWRIGHT_BROWSERS_PATH"], exist_ok=True)
     
     # Verify browser exists, reinstall if missing
-    browser_path = "/opt/render/.cache/ms-playwright/chromium-1105/chrome-linux/chrome"
-    if not os.path.exists(browser_path):
+    if not os.path.exists(RENDER_CHROMIUM_PATH):
         print("Chromium not found, reinstalling...")
         from playwright.__main__ import main
         sys.argv = ['', 'install', 'chromium', '--force']
         main()
 
+def browser_launch_options():
+    """Chromium launch options, using the Render browser build when present"""
+    options = dict(
+        headless=True,
+        args=[
+            '--single-process',
+            '--no-zygote',
+            '--no-sandbox',
+            '--disable-dev-shm-usage',
+            '--disable-gpu',
+            '--disable-setuid-sandbox',
+            '--disable-accelerated-2d-canvas',
+            '--no-first-run'
+        ]
+    )
+    if os.path.exists(RENDER_CHROMIUM_PATH):
+        options["executable_path"] = RENDER_CHROMIUM_PATH
+    return options
+
 def get_browser_instance():
     """Get a browser instance with Render-specific configuration"""
     try:
         playwright = sync_playwright().start()
-        browser = playwright.chromium.launch(
-            headless=True,
-            executable_path="/opt/render/.cache/ms-playwright/chromium-1105/chrome-linux/chrome",
-            args=[
-                '--single-process',
-                '--no-zygote',
-                '--no-sandbox',
-                '--disable-dev-shm-usage',
-                '--disable-gpu',
-                '--disable-setuid-sandbox',
-                '--disable-accelerated-2d-canvas',
-                '--no-first-run'
-            ]
-        )
+        browser = playwright.chromium.launch(**browser_launch_options())
         return playwright, browser
     except Exception as e:
         print(f"Failed to launch browser: {str(e)}")
@@ -84,6 +116,12 @@ def sanitize_filename(filename):
 
     return filename.strip('_.')
 
+def content_hash(data):
+    """SHA-256 hex digest of text or bytes."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
 def validate_url(url):
     try:
         parsed = urlparse(url)
@@ -128,7 +166,8 @@ def format_tree_md(tree, base_url, indent=0):
 
 def get_homepage_info(url):
     try:
-        resp = requests.get(url, timeout=30)
+        # Interactive fetch: retries must fit a short overall budget
+        resp = resilient_get(url, deadline=time.monotonic() + HOMEPAGE_DEADLINE)
         resp.raise_for_status()
         soup = BeautifulSoup(resp.text, "html.parser")
 
@@ -145,9 +184,40 @@ def get_homepage_info(url):
         meta = meta_el.get("content", "No Description").strip() if meta_el else "No Description"
 
         return sanitize_text(title), sanitize_text(meta)
-    except Exception:
+    except Exception as e:
+        print(f"Failed to fetch homepage info for {url}: {str(e)}")
         return "No Title", "No Description"
 
+def build_llms_txt(homepage_url, tree):
+    """Build llms.txt content from an extracted navigation tree."""
+    md_tree = format_tree_md(tree, homepage_url)
+    homepage_title, homepage_meta = get_homepage_info(homepage_url)
+
+    md_lines = [
+        f"# {homepage_title}",
+        "",
+        f"> {homepage_meta}",
+        "",
+        "## Navigation",
+        "",
+        md_tree
+    ]
+    return "\n".join(md_lines)
+
+def parse_url_lines(input_urls):
+    """Collect URLs from markdown links or raw URLs, one per line."""
+    urls = []
+    for line in input_urls.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        match = re.search(r'\[.*?\]\((.*?)\)', line)
+        if match:
+            urls.append(match.group(1))
+        elif line.startswith(('http://', 'https://')):
+            urls.append(line)
+    return urls
+
 def convert_links_to_structured(input_text):
     import re
     patterns = [
@@ -172,17 +242,84 @@ def convert_links_to_structured(input_text):
 
     return unique_links
 
+def format_structured_links(links):
+    """llms.txt list lines for a {url: title} mapping."""
+    return "\n".join(f"- [{title}]({url})" for url, title in links.items())
+
 def process_webpage_to_markdown(url):
+    filename, md_content, _, _ = process_webpage_incremental(url)
+    return filename, md_content
+
+def process_webpage_incremental(url, previous=None, deadline=None):
+    """
+    Convert a URL to markdown, reusing the previous run's output where possible.
+
+    Sends conditional request headers from the previous manifest entry and
+    skips extraction when the server answers 304 or the HTML hash matches.
+    Returns (filename, markdown, manifest entry, status) where status is one
+    of "added", "changed", "unchanged", "error" or "timeout" (the batch
+    deadline passed before the page could be fetched).
+    """
     try:
-        resp = requests.get(url, timeout=30)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, 'html.parser')
-        md_content = extract_key_content(soup)
-        filename = sanitize_filename(url)
-        return filename, md_content
+        resp = resilient_get(url, headers=conditional_headers(previous), deadline=deadline)
+        if not (resp.status_code == 304 and previous):
+            resp.raise_for_status()
+        return incremental_result(url, resp.status_code, resp.headers, resp.content, resp.text, previous)
     except Exception as e:
-        error_filename = sanitize_filename(url + '_error')
-        return error_filename, f"Error processing {url}: {str(e)}"
+        return fetch_error_result(url, e, previous)
+
+def conditional_headers(previous):
+    headers = {}
+    # Rendered pages need the shell's body to re-extract, so a 304 is no use for them
+    if previous and not previous.get("rendered"):
+        if previous.get("etag"):
+            headers["If-None-Match"] = previous["etag"]
+        if previous.get("last_modified"):
+            headers["If-Modified-Since"] = previous["last_modified"]
+    return headers
+
+def incremental_result(url, status_code, headers, content, text, previous):
+    """Build the process_webpage_incremental result for a fetched page."""
+    fetched_at = datetime.now(timezone.utc).isoformat()
+
+    if status_code == 304 and previous:
+        entry = dict(previous, fetched_at=fetched_at, status_code=304)
+        return entry["filename"], entry["markdown"], entry, "unchanged"
+
+    html_hash = content_hash(content)
+    # Stored markdown of a rendered page came from the DOM, not this HTML
+    if previous and previous.get("content_hash") == html_hash and not previous.get("rendered"):
+        md_content = previous["markdown"]
+    else:
+        soup = BeautifulSoup(text, 'html.parser')
+        md_content = extract_key_content(soup)
+
+    entry = {
+        "filename": sanitize_filename(url),
+        "content_hash": html_hash,
+        "markdown_hash": content_hash(md_content),
+        "markdown": md_content,
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+        "status_code": status_code,
+        "fetched_at": fetched_at,
+    }
+    if previous and previous.get("rendered"):
+        entry["rendered"] = True
+
+    if not previous:
+        status = "added"
+    elif previous.get("markdown_hash") != entry["markdown_hash"]:
+        status = "changed"
+    else:
+        status = "unchanged"
+    return entry["filename"], md_content, entry, status
+
+def fetch_error_result(url, error, previous):
+    error_filename = sanitize_filename(url + '_error')
+    if isinstance(error, DeadlineExceeded):
+        return error_filename, f"Skipped {url}: {str(error)}", previous, "timeout"
+    return error_filename, f"Error processing {url}: {str(error)}", previous, "error"
 
 def extract_key_content(soup):
     """
@@ -201,30 +338,1413 @@ def extract_key_content(soup):
     if not main_content:
         main_content = soup.body
 
+    meta_desc = soup.find('meta', {'name': 'description'})
+    parts = {
+        "description": meta_desc.get('content') if meta_desc else None,
+        "title": soup.title.string if soup.title else "Untitled Page",
+        "headings": [heading.get_text(strip=True) for heading in main_content.find_all(['h1', 'h2', 'h3'])],
+        "paragraphs": [p.get_text(strip=True) for p in main_content.find_all('p', limit=5)],
+    }
+    return format_key_content(parts)
+
+def format_key_content(parts):
+    """Render key content parts (description, title, headings, paragraphs) as markdown."""
     key_elements = []
 
-    meta_desc = soup.find('meta', {'name': 'description'})
-    if meta_desc and meta_desc.get('content'):
-        key_elements.append(f"# Page Description\n\n{meta_desc['content']}\n")
+    if parts.get("description"):
+        key_elements.append(f"# Page Description\n\n{parts['description']}\n")
 
-    title = soup.title.string if soup.title else "Untitled Page"
-    key_elements.append(f"# {title}\n")
+    key_elements.append(f"# {parts.get('title')}\n")
 
-    for heading in main_content.find_all(['h1', 'h2', 'h3']):
-        key_elements.append(f"## {heading.get_text(strip=True)}\n")
+    for heading in parts.get("headings", []):
+        key_elements.append(f"## {heading}\n")
 
-    paragraphs = main_content.find_all('p', limit=5)
-    for p in paragraphs:
-        text = p.get_text(strip=True)
+    for text in parts.get("paragraphs", []):
         if text:
             key_elements.append(f"{text}\n")
 
     return "\n".join(key_elements)
 
+# -----------------------------
+# Fetch Scheduling
+# -----------------------------
+HOST_RATE = float(os.environ.get("LLMS_HOST_RATE", "5"))
+HOST_BURST = float(os.environ.get("LLMS_HOST_BURST", "5"))
+HOST_MAX_CONCURRENCY = int(os.environ.get("LLMS_HOST_MAX_CONCURRENCY", "8"))
+HOST_INITIAL_CONCURRENCY = 2
+LATENCY_SPIKE_FACTOR = 3.0
+BATCH_WORKERS = int(os.environ.get("LLMS_BATCH_WORKERS", "16"))
+
+class DeadlineExceeded(Exception):
+    pass
+
+def parse_retry_after(value):
+    """Parse a Retry-After header (seconds or HTTP-date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except Exception:
+        return None
+
+class HostState:
+    def __init__(self, host, lock):
+        self.host = host
+        self.cond = threading.Condition(lock)
+        self.queue = deque()
+        self.rate = HOST_RATE
+        self.burst = HOST_BURST
+        self.tokens = HOST_BURST
+        self.last_refill = time.monotonic()
+        self.concurrency = float(HOST_INITIAL_CONCURRENCY)
+        self.in_flight = 0
+        self.not_before = 0.0
+        self.crawl_delay = None
+        self.robots_lock = threading.Lock()
+        self.robots_checked = False
+        self.latency_ewma = None
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+class HostScheduler:
+    """
+    Per-host politeness scheduler.
+
+    Each host has its own FIFO queue, a token bucket (slowed down to the
+    robots.txt Crawl-delay when one is set) and an AIMD concurrency limit:
+    healthy responses grow it by roughly one slot per window, while 429/503,
+    errors and latency spikes halve it. Retry-After pauses the whole host.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def _state(self, host):
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = HostState(host, self._lock)
+            return self._hosts[host]
+
+    def _load_robots(self, state, url):
+        with state.robots_lock:
+            if state.robots_checked:
+                return
+            parsed = urlparse(url)
+            crawl_delay = None
+            try:
+                resp = requests.get(f"{parsed.scheme}://{parsed.netloc}/robots.txt", timeout=10)
+                if resp.status_code == 200:
+                    parser = RobotFileParser()
+                    parser.parse(resp.text.splitlines())
+                    crawl_delay = parser.crawl_delay("*")
+            except Exception as e:
+                print(f"Could not read robots.txt for {parsed.netloc}: {str(e)}")
+            with self._lock:
+                if crawl_delay:
+                    state.crawl_delay = float(crawl_delay)
+                    state.rate = min(state.rate, 1.0 / state.crawl_delay)
+                    state.burst = 1.0
+                    state.tokens = min(state.tokens, 1.0)
+                state.robots_checked = True
+
+    def acquire(self, url, deadline=None):
+        """
+        Block until a request to url may start; returns the start time.
+
+        Raises DeadlineExceeded if the monotonic deadline passes first.
+        """
+        state = self._state(urlparse(url).netloc)
+        if not state.robots_checked:
+            self._load_robots(state, url)
+
+        with self._lock:
+            ticket = object()
+            state.queue.append(ticket)
+            while True:
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    state.queue.remove(ticket)
+                    state.cond.notify_all()
+                    raise DeadlineExceeded(f"Batch deadline reached while queued for {state.host}")
+                state.refill(now)
+                if (state.queue[0] is ticket and state.tokens >= 1
+                        and state.in_flight < int(state.concurrency)
+                        and now >= state.not_before):
+                    state.queue.popleft()
+                    state.tokens -= 1
+                    state.in_flight += 1
+                    state.cond.notify_all()
+                    return now
+
+                waits = []
+                if state.tokens < 1:
+                    waits.append((1 - state.tokens) / state.rate)
+                if state.not_before > now:
+                    waits.append(state.not_before - now)
+                timeout = max(waits) if waits else None
+                if deadline is not None:
+                    timeout = deadline - now if timeout is None else min(timeout, deadline - now)
+                state.cond.wait(timeout=timeout)
+
+    def abandon(self, url):
+        """Free a granted slot whose request was cancelled, without recording an outcome."""
+        state = self._state(urlparse(url).netloc)
+        with self._lock:
+            state.in_flight -= 1
+            state.cond.notify_all()
+
+    def release(self, url, started, status_code=None, retry_after=None, error=False):
+        """Record a finished request and adjust the host's concurrency."""
+        state = self._state(urlparse(url).netloc)
+        with self._lock:
+            now = time.monotonic()
+            latency = now - started
+            state.in_flight -= 1
+            state.requests += 1
+
+            spike = (state.latency_ewma is not None and state.requests > 5
+                     and latency > LATENCY_SPIKE_FACTOR * state.latency_ewma)
+            if error or status_code in (429, 503):
+                state.concurrency = max(1.0, state.concurrency / 2)
+                if error:
+                    state.errors += 1
+                else:
+                    state.throttled += 1
+                if retry_after:
+                    state.not_before = max(state.not_before, now + retry_after)
+            elif spike:
+                state.concurrency = max(1.0, state.concurrency / 2)
+            else:
+                state.concurrency = min(HOST_MAX_CONCURRENCY, state.concurrency + 1.0 / state.concurrency)
+
+            if not error:
+                state.latency_ewma = latency if state.latency_ewma is None else 0.8 * state.latency_ewma + 0.2 * latency
+            state.cond.notify_all()
+
+    def stats(self):
+        """Snapshot of per-host scheduling statistics."""
+        with self._lock:
+            return {
+                host: {
+                    "concurrency": int(state.concurrency),
+                    "in_flight": state.in_flight,
+                    "queued": len(state.queue),
+                    "rate": state.rate,
+                    "crawl_delay": state.crawl_delay,
+                    "requests": state.requests,
+                    "throttled": state.throttled,
+                    "errors": state.errors,
+                    "latency_ewma": state.latency_ewma,
+                }
+                for host, state in self._hosts.items()
+            }
+
+fetch_scheduler = HostScheduler()
+default_acquire_executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS)
+
+def polite_get(url, deadline=None, **kwargs):
+    """requests.get routed through the per-host scheduler."""
+    started = fetch_scheduler.acquire(url, deadline)
+    try:
+        resp = requests.get(url, **kwargs)
+    except Exception:
+        fetch_scheduler.release(url, started, error=True)
+        raise
+    fetch_scheduler.release(
+        url, started,
+        status_code=resp.status_code,
+        retry_after=parse_retry_after(resp.headers.get("Retry-After"))
+    )
+    return resp
+
+# -----------------------------
+# Fetch Resilience
+# -----------------------------
+CONNECT_TIMEOUT = float(os.environ.get("LLMS_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.environ.get("LLMS_READ_TIMEOUT", "30"))
+FETCH_RETRIES = int(os.environ.get("LLMS_FETCH_RETRIES", "3"))
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 10.0
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+BREAKER_FAILURE_THRESHOLD = int(os.environ.get("LLMS_BREAKER_THRESHOLD", "5"))
+BREAKER_COOLDOWN = float(os.environ.get("LLMS_BREAKER_COOLDOWN", "30"))
+BATCH_DEADLINE = float(os.environ.get("LLMS_BATCH_DEADLINE", "540"))
+HOMEPAGE_DEADLINE = float(os.environ.get("LLMS_HOMEPAGE_DEADLINE", "20"))
+
+class CircuitOpenError(Exception):
+    pass
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker.
+
+    After BREAKER_FAILURE_THRESHOLD consecutive failures the host is
+    failed fast for BREAKER_COOLDOWN seconds, then one trial request per
+    cooldown is let through; its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def _state(self, host):
+        return self._hosts.setdefault(host, {"failures": 0, "opened_at": None, "trial_at": None})
+
+    def before_request(self, host):
+        with self._lock:
+            state = self._state(host)
+            if state["opened_at"] is None:
+                return
+            now = time.monotonic()
+            last_attempt = state["trial_at"] or state["opened_at"]
+            if now - last_attempt >= BREAKER_COOLDOWN:
+                state["trial_at"] = now
+                return
+            raise CircuitOpenError(f"Circuit open for {host} after {state['failures']} consecutive failures")
+
+    def record(self, host, success):
+        with self._lock:
+            state = self._state(host)
+            state["trial_at"] = None
+            if success:
+                state["failures"] = 0
+                state["opened_at"] = None
+                return
+            state["failures"] += 1
+            if state["failures"] >= BREAKER_FAILURE_THRESHOLD:
+                if state["opened_at"] is None:
+                    print(f"Opening circuit for {host}")
+                state["opened_at"] = time.monotonic()
+
+circuit_breaker = CircuitBreaker()
+
+def resilient_get(url, headers=None, deadline=None):
+    """
+    GET with separate connect/read timeouts, jittered exponential retries
+    for connection errors and retryable status codes, the per-host circuit
+    breaker and an optional monotonic deadline.
+
+    Returns the last response (which may still carry an error status) or
+    raises the last exception. Raises DeadlineExceeded when the deadline
+    leaves no time for another attempt.
+    """
+    host = urlparse(url).netloc
+    for attempt in range(FETCH_RETRIES + 1):
+        circuit_breaker.before_request(host)
+        read_timeout = attempt_read_timeout(url, deadline)
+
+        retry_after = None
+        try:
+            resp = polite_get(url, deadline=deadline, timeout=(CONNECT_TIMEOUT, read_timeout), headers=headers)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            circuit_breaker.record(host, success=False)
+            if attempt == FETCH_RETRIES:
+                raise
+            print(f"Fetch attempt {attempt + 1} for {url} failed: {str(e)}")
+        else:
+            circuit_breaker.record(host, success=resp.status_code < 500)
+            if resp.status_code not in RETRYABLE_STATUS_CODES or attempt == FETCH_RETRIES:
+                return resp
+            retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+
+        time.sleep(retry_delay(url, attempt, retry_after, deadline))
+
+def attempt_read_timeout(url, deadline):
+    """Read timeout for the next attempt, capped by the remaining deadline."""
+    if deadline is None:
+        return READ_TIMEOUT
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise DeadlineExceeded(f"Batch deadline reached before fetching {url}")
+    return min(READ_TIMEOUT, remaining)
+
+def retry_delay(url, attempt, retry_after, deadline):
+    """Jittered exponential backoff, at least Retry-After, within the deadline."""
+    delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+    if retry_after:
+        delay = max(delay, retry_after)
+    if deadline is not None and time.monotonic() + delay >= deadline:
+        raise DeadlineExceeded(f"Batch deadline reached while retrying {url}")
+    return delay
+
+# -----------------------------
+# Async HTTP/2 Fetching
+# -----------------------------
+FETCH_BACKEND = os.environ.get("LLMS_FETCH_BACKEND", "requests")
+MAX_PAGE_BYTES = int(os.environ.get("LLMS_MAX_PAGE_BYTES", str(20 * 1024 * 1024)))
+
+async def acquire_slot_async(url, deadline, executor=None):
+    """
+    Await a fetch_scheduler slot from a coroutine.
+
+    The blocking acquire runs on executor. If the awaiting task is cancelled
+    while acquire is already running, the slot it eventually grants is
+    handed straight back so it cannot leak.
+    """
+    def acquire():
+        return fetch_scheduler.acquire(url, deadline)
+
+    future = (executor or default_acquire_executor).submit(acquire)
+    try:
+        return await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        def abandon_granted(done):
+            if not done.cancelled() and done.exception() is None:
+                fetch_scheduler.abandon(url)
+        future.add_done_callback(abandon_granted)
+        raise
+
+async def resilient_get_async(client, url, headers=None, deadline=None, acquire_executor=None):
+    """
+    Async counterpart of resilient_get on a shared HTTP/2 client.
+
+    The body is streamed and decompressed chunk by chunk. Returns
+    (status_code, headers, content, text) for the last response.
+    """
+    host = urlparse(url).netloc
+    for attempt in range(FETCH_RETRIES + 1):
+        circuit_breaker.before_request(host)
+        timeout = httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT, read=attempt_read_timeout(url, deadline))
+
+        retry_after = None
+        started = await acquire_slot_async(url, deadline, acquire_executor)
+        try:
+            async with client.stream("GET", url, headers=headers, timeout=timeout) as resp:
+                body = bytearray()
+                async for chunk in resp.aiter_bytes():
+                    body.extend(chunk)
+                    if len(body) > MAX_PAGE_BYTES:
+                        raise ValueError(f"Response from {url} exceeds {MAX_PAGE_BYTES} bytes")
+        except httpx.TransportError as e:
+            fetch_scheduler.release(url, started, error=True)
+            circuit_breaker.record(host, success=False)
+            if attempt == FETCH_RETRIES:
+                raise
+            print(f"Fetch attempt {attempt + 1} for {url} failed: {str(e)}")
+        except asyncio.CancelledError:
+            fetch_scheduler.abandon(url)
+            raise
+        except Exception:
+            fetch_scheduler.release(url, started, error=True)
+            raise
+        else:
+            retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+            fetch_scheduler.release(url, started, status_code=resp.status_code, retry_after=retry_after)
+            circuit_breaker.record(host, success=resp.status_code < 500)
+            if resp.status_code not in RETRYABLE_STATUS_CODES or attempt == FETCH_RETRIES:
+                content = bytes(body)
+                text = content.decode(resp.charset_encoding or "utf-8", errors="replace")
+                return resp.status_code, resp.headers, content, text
+
+        await asyncio.sleep(retry_delay(url, attempt, retry_after, deadline))
+
+async def process_webpage_incremental_async(client, url, previous=None, deadline=None, acquire_executor=None):
+    """process_webpage_incremental over the shared HTTP/2 client."""
+    try:
+        status_code, headers, content, text = await resilient_get_async(
+            client, url, headers=conditional_headers(previous), deadline=deadline,
+            acquire_executor=acquire_executor
+        )
+        if status_code >= 400:
+            raise ValueError(f"HTTP {status_code} for url: {url}")
+        return await asyncio.to_thread(incremental_result, url, status_code, headers, content, text, previous)
+    except Exception as e:
+        return fetch_error_result(url, e, previous)
+
+class AsyncFetcher:
+    """
+    Background event loop with one HTTP/2 client for a batch.
+
+    httpx negotiates HTTP/2 via ALPN and multiplexes all requests to a host
+    over a single connection. submit() returns a concurrent.futures.Future,
+    so callers can wait on it alongside thread pool futures.
+
+    Blocking scheduler acquires run on a dedicated executor, so they never
+    starve the loop's default executor used for parsing fetched pages.
+    """
+
+    def __init__(self):
+        if httpx is None:
+            raise ImportError("httpx is not installed")
+        self.acquire_executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS)
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        try:
+            self.client = self._run(self._create_client()).result()
+        except Exception:
+            self._stop()
+            raise
+
+    async def _create_client(self):
+        return httpx.AsyncClient(
+            http2=True,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=BATCH_WORKERS, max_keepalive_connections=BATCH_WORKERS)
+        )
+
+    def _run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def submit(self, url, previous, deadline):
+        return self._run(process_webpage_incremental_async(
+            self.client, url, previous, deadline, self.acquire_executor
+        ))
+
+    async def _shutdown(self):
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.client.aclose()
+
+    def _stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+        self.acquire_executor.shutdown(wait=False, cancel_futures=True)
+
+    def close(self):
+        """Cancel and await outstanding fetches, so their host slots are freed, then stop."""
+        try:
+            self._run(self._shutdown()).result(timeout=30)
+        except Exception as e:
+            print(f"Failed to shut down HTTP/2 fetcher: {str(e)}")
+        self._stop()
+
+# -----------------------------
+# Near-Duplicate Detection
+# -----------------------------
+NEAR_DUP_THRESHOLD = float(os.environ.get("LLMS_NEAR_DUP_THRESHOLD", "0.6"))
+NEAR_DUP_MIN_TOKENS = int(os.environ.get("LLMS_NEAR_DUP_MIN_TOKENS", "20"))
+MINHASH_SIZE = 64
+MINHASH_BANDS = 16
+
+def text_features(text):
+    """Word unigrams and bigrams; short extracted pages have too few longer shingles."""
+    tokens = re.findall(r'\w+', text.lower())
+    return tokens, set(tokens) | {f"{a} {b}" for a, b in zip(tokens, tokens[1:])}
+
+def minhash(text):
+    """
+    MinHash signature of a text as a hex string of MINHASH_SIZE 16-bit minima.
+
+    The share of equal positions in two signatures estimates the Jaccard
+    similarity of their word unigram/bigram sets. Returns None for texts too
+    short to fingerprint reliably, so that near-empty pages (e.g. SPA
+    shells) are never clustered together.
+    """
+    tokens, features = text_features(text)
+    if len(tokens) < NEAR_DUP_MIN_TOKENS:
+        return None
+
+    signature = [0xFFFF] * MINHASH_SIZE
+    for feature in features:
+        # One keyed 128-byte digest per feature supplies all 64 independent 16-bit hashes
+        digest = (hashlib.blake2b(feature.encode("utf-8"), digest_size=64, person=b"llms-mh0").digest()
+                  + hashlib.blake2b(feature.encode("utf-8"), digest_size=64, person=b"llms-mh1").digest())
+        for i in range(MINHASH_SIZE):
+            value = (digest[2 * i] << 8) | digest[2 * i + 1]
+            if value < signature[i]:
+                signature[i] = value
+    return "".join(f"{value:04x}" for value in signature)
+
+def minhash_similarity(a, b):
+    """Estimated Jaccard similarity of two minhash() signatures."""
+    return sum(a[i:i + 4] == b[i:i + 4] for i in range(0, len(a), 4)) / (len(a) // 4)
+
+class NearDuplicateIndex:
+    """
+    In-memory MinHash LSH index.
+
+    Signatures are split into MINHASH_BANDS bands; only pages sharing an
+    identical band are compared. With 16 bands of 4 rows, pairs at Jaccard
+    0.7 become candidates about 99% of the time, pairs at 0.2 under 3%.
+    """
+
+    def __init__(self, threshold=NEAR_DUP_THRESHOLD, bands=MINHASH_BANDS):
+        self.threshold = threshold
+        width = MINHASH_SIZE * 4 // bands
+        self.bands = [(i * width, (i + 1) * width) for i in range(bands)]
+        self.buckets = [{} for _ in self.bands]
+
+    def find(self, signature):
+        """Return the key of the most similar indexed near-duplicate, or None."""
+        best, best_similarity = None, self.threshold
+        seen = set()
+        for buckets, (start, end) in zip(self.buckets, self.bands):
+            for other, key in buckets.get(signature[start:end], ()):
+                if key in seen:
+                    continue
+                seen.add(key)
+                similarity = minhash_similarity(signature, other)
+                if similarity >= best_similarity:
+                    best, best_similarity = key, similarity
+        return best
+
+    def add(self, signature, key):
+        for buckets, (start, end) in zip(self.buckets, self.bands):
+            buckets.setdefault(signature[start:end], []).append((signature, key))
+
+# -----------------------------
+# JS Rendering
+# -----------------------------
+RENDER_CONCURRENCY = int(os.environ.get("LLMS_RENDER_CONCURRENCY", "4"))
+RENDER_TIMEOUT = 30000
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet"}
+
+# Mirrors extract_key_content against the live DOM
+KEY_CONTENT_JS = """
+() => {
+    const clean = (text) => (text || '').replace(/\\s+/g, ' ').trim();
+    const meta = document.querySelector('meta[name="description"]');
+    const body = document.body.cloneNode(true);
+    body.querySelectorAll('script, style, header, footer, nav, aside').forEach(el => el.remove());
+    const main = body.querySelector('main, article') || body;
+    return {
+        description: meta ? meta.getAttribute('content') : null,
+        title: document.title || 'Untitled Page',
+        headings: Array.from(main.querySelectorAll('h1, h2, h3')).map(h => clean(h.textContent)),
+        paragraphs: Array.from(main.querySelectorAll('p')).slice(0, 5)
+            .map(p => clean(p.textContent)).filter(Boolean)
+    };
+}
+"""
+
+def key_content_is_empty(md_content):
+    """True when key content has nothing after the title (e.g. an SPA shell)."""
+    lines = md_content.splitlines()
+    title_index = max((i for i, line in enumerate(lines) if line.startswith("# ")), default=-1)
+    return not any(line.strip() for line in lines[title_index + 1:])
+
+async def _block_heavy_resources(route):
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+async def polite_goto(page, url, deadline):
+    """
+    page.goto under the same per-host scheduler and circuit breaker as
+    plain HTTP fetches, so rendering cannot bypass host politeness limits.
+    """
+    host = urlparse(url).netloc
+    circuit_breaker.before_request(host)
+    started = await acquire_slot_async(url, deadline)
+    remaining_ms = (deadline - time.monotonic()) * 1000
+    try:
+        if remaining_ms <= 0:
+            raise DeadlineExceeded(f"Batch deadline reached before rendering {url}")
+        response = await page.goto(url, wait_until="domcontentloaded", timeout=min(RENDER_TIMEOUT, remaining_ms))
+    except PlaywrightTimeoutError as e:
+        if remaining_ms >= RENDER_TIMEOUT:
+            fetch_scheduler.release(url, started, error=True)
+            circuit_breaker.record(host, success=False)
+            raise
+        # Only the batch running out of time cut this load short; that says nothing about the host
+        fetch_scheduler.abandon(url)
+        raise DeadlineExceeded(f"Batch deadline reached while rendering {url}") from e
+    except (asyncio.CancelledError, DeadlineExceeded):
+        fetch_scheduler.abandon(url)
+        raise
+    except Exception:
+        fetch_scheduler.release(url, started, error=True)
+        circuit_breaker.record(host, success=False)
+        raise
+    status_code = response.status if response else None
+    retry_after = parse_retry_after(response.headers.get("retry-after")) if response else None
+    fetch_scheduler.release(url, started, status_code=status_code, retry_after=retry_after)
+    circuit_breaker.record(host, success=status_code is None or status_code < 500)
+
+async def _render_key_content(urls, deadline, results):
+    """Render urls on a shared pool of pages, putting (url, markdown, error) on results."""
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch(**browser_launch_options())
+        try:
+            context = await browser.new_context()
+            await context.route("**/*", _block_heavy_resources)
+            pages = asyncio.Queue()
+            for _ in range(min(RENDER_CONCURRENCY, len(urls))):
+                await pages.put(await context.new_page())
+
+            async def render(url):
+                page = await pages.get()
+                try:
+                    await polite_goto(page, url, deadline)
+                    remaining_ms = (deadline - time.monotonic()) * 1000
+                    try:
+                        await page.wait_for_load_state("networkidle", timeout=max(1, min(5000, remaining_ms)))
+                    except PlaywrightTimeoutError:
+                        pass
+                    parts = await page.evaluate(KEY_CONTENT_JS)
+                    results.put((url, format_key_content(parts), None))
+                except Exception as e:
+                    results.put((url, None, e))
+                finally:
+                    await pages.put(page)
+
+            await asyncio.gather(*(render(url) for url in urls))
+        finally:
+            await browser.close()
+
+def iter_rendered_key_content(urls, deadline):
+    """
+    Render urls with Playwright in a background event loop.
+
+    Yields (url, markdown, error) for every URL as it finishes; URLs left
+    when the deadline passes or the browser fails are yielded with an error.
+    """
+    remaining = set(urls)
+    failure = []
+    if deadline - time.monotonic() > 0:
+        results = queue.Queue()
+
+        def run():
+            try:
+                asyncio.run(_render_key_content(urls, deadline, results))
+            except Exception as e:
+                print(f"Rendering failed: {str(e)}")
+                failure.append(e)
+            finally:
+                results.put(None)
+
+        threading.Thread(target=run, daemon=True).start()
+        while remaining:
+            try:
+                item = results.get(timeout=max(0.1, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is None:
+                break
+            remaining.discard(item[0])
+            yield item
+
+    for url in remaining:
+        if failure:
+            # e.g. the browser failed to launch; report that rather than a deadline
+            yield url, None, failure[0]
+        else:
+            yield url, None, DeadlineExceeded(f"Rendering {url} did not finish before the batch deadline")
+
+def rendered_result(url, md_content, error, static_result, previous):
+    """
+    Turn a rendering outcome into a process_webpage_incremental-style result.
+
+    Falls back to the static result when rendering fails.
+    """
+    if error is not None:
+        print(f"Rendering {url} failed: {str(error)}")
+        if static_result is not None:
+            return static_result
+        status = "timeout" if isinstance(error, DeadlineExceeded) else "error"
+        return sanitize_filename(url + '_error'), f"Error rendering {url}: {str(error)}", previous, status
+
+    static_entry = static_result[2] if static_result else None
+    entry = dict(static_entry or {
+        "filename": sanitize_filename(url),
+        "content_hash": None,
+        "etag": None,
+        "last_modified": None,
+        "status_code": None,
+    })
+    entry.update(
+        markdown=md_content,
+        markdown_hash=content_hash(md_content),
+        rendered=True,
+        fetched_at=datetime.now(timezone.utc).isoformat()
+    )
+    if not previous:
+        status = "added"
+    elif previous.get("markdown_hash") != entry["markdown_hash"]:
+        status = "changed"
+    else:
+        status = "unchanged"
+    return entry["filename"], md_content, entry, status
+
+# -----------------------------
+# Incremental Regeneration
+# -----------------------------
+MANIFEST_DIR = Path(os.environ.get("LLMS_MANIFEST_DIR", ".llms_manifests"))
+
+MANIFEST_QUERY_CHUNK = 500
+
+def manifest_path(host):
+    safe_host = re.sub(r'[^\w\-.]', '_', host)
+    return MANIFEST_DIR / f"{safe_host}.sqlite"
+
+def connect_manifest(host):
+    """
+    Open a host's manifest database, creating it on first use.
+
+    Each URL is one row: its metadata entry (hashes, ETag/Last-Modified,
+    fingerprint, duplicate_of) as JSON, and its extracted markdown in a
+    separate column. Batches read and write only their own rows, and
+    SQLite's locking serializes writers across threads and worker processes.
+    """
+    MANIFEST_DIR.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(manifest_path(host), timeout=60, isolation_level=None)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, entry TEXT NOT NULL, markdown TEXT)")
+    import_json_manifest(db, host)
+    return db
+
+def import_json_manifest(db, host):
+    """One-time import of a manifest written as a single JSON file by earlier versions."""
+    legacy_path = manifest_path(host).with_suffix(".json")
+    try:
+        with open(legacy_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        pages = manifest.get("pages", {}) if manifest.get("version") == 1 else {}
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.executemany(
+                "INSERT OR IGNORE INTO pages (url, entry, markdown) VALUES (?, ?, ?)",
+                [manifest_row(url, entry) for url, entry in pages.items()]
+            )
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        legacy_path.unlink()
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Could not import JSON manifest for {host}: {str(e)}")
+
+def manifest_row(url, entry):
+    metadata = {key: value for key, value in entry.items() if key != "markdown"}
+    return url, json.dumps(metadata), entry.get("markdown")
+
+def load_manifest_entries(host, urls):
+    """Previous manifest entries, markdown included, for the given URLs of a host."""
+    entries = {}
+    try:
+        with contextlib.closing(connect_manifest(host)) as db:
+            for i in range(0, len(urls), MANIFEST_QUERY_CHUNK):
+                chunk = urls[i:i + MANIFEST_QUERY_CHUNK]
+                rows = db.execute(
+                    f"SELECT url, entry, markdown FROM pages WHERE url IN ({','.join('?' * len(chunk))})", chunk
+                )
+                for url, entry, markdown in rows:
+                    entries[url] = dict(json.loads(entry), markdown=markdown)
+    except Exception as e:
+        print(f"Ignoring unreadable manifest for {host}: {str(e)}")
+    return entries
+
+def save_manifest_entries(host, entries, full_list=None):
+    """
+    Upsert a batch's entries into a host manifest in one transaction.
+
+    With full_list (the site's complete set of URLs), every other page is
+    deleted as well; their URLs are returned.
+    """
+    removed = []
+    with contextlib.closing(connect_manifest(host)) as db:
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.executemany(
+                "INSERT OR REPLACE INTO pages (url, entry, markdown) VALUES (?, ?, ?)",
+                [manifest_row(url, entry) for url, entry in entries.items()]
+            )
+            if full_list is not None:
+                removed = [url for (url,) in db.execute("SELECT url FROM pages") if url not in full_list]
+                db.executemany("DELETE FROM pages WHERE url = ?", [(url,) for url in removed])
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+    return removed
+
+def iter_convert_urls(urls, dedupe=False, skip_known_duplicates=False, render_mode="auto",
+                      deadline_seconds=BATCH_DEADLINE, fetch_backend=FETCH_BACKEND, full_list=False):
+    """
+    Convert a batch of URLs concurrently against the per-host manifests.
+
+    Yields one record per URL ({"url", "filename", "status", "markdown",
+    "duplicate_of"}) as pages finish. With full_list, the batch is taken to
+    be the site's complete URL list: every URL in the manifests that is
+    missing from it is yielded as "removed" and dropped. Otherwise the
+    batch's entries are merged into the manifests and other pages are left
+    alone, so concurrent partial batches do not overwrite each other.
+    Only the batch's own manifest rows are read and written. URLs
+    still unfinished when deadline_seconds runs out are yielded with status
+    "timeout" so callers get partial results instead of a worker timeout.
+
+    With dedupe, pages whose extracted text is a near-duplicate of another
+    page are marked "duplicate" and carry no markdown. Clusters are settled
+    once every page is fetched, so records are yielded at the end of the
+    batch. The canonical page is the one that was canonical last run,
+    otherwise the earliest in input order, so it is the same from run to
+    run. With skip_known_duplicates, pages recorded as duplicates of a
+    canonical page in this batch are only fetched if the canonical page
+    changed.
+
+    render_mode selects how pages are fetched: "off" uses plain HTTP only,
+    "auto" re-renders pages whose static key content is empty, and pages
+    rendered on an earlier run, with Playwright, and "always" renders every
+    page.
+
+    fetch_backend selects the HTTP client: "requests" (one HTTP/1.1 request
+    per URL on the thread pool) or "http2" (AsyncFetcher, multiplexing
+    requests over one HTTP/2 connection per host).
+    """
+    urls = list(dict.fromkeys(urls))
+    batch = set(urls)
+    host_urls = {}
+    for url in urls:
+        host_urls.setdefault(urlparse(url).netloc, []).append(url)
+    previous_entries = {}
+    for host, host_batch in host_urls.items():
+        previous_entries.update(load_manifest_entries(host, host_batch))
+    updates = {host: {} for host in host_urls}
+    order = {url: i for i, url in enumerate(urls)}
+    held = []
+
+    def previous_entry(url):
+        return previous_entries.get(url)
+
+    def finish(url, filename, md_content, entry, status):
+        if entry and status not in ("error", "timeout"):
+            entry = dict(entry)
+            if status == "unchanged" and "minhash" in entry:
+                fingerprint = entry["minhash"]
+            else:
+                fingerprint = minhash(md_content)
+            entry.pop("simhash", None)
+            entry["minhash"] = fingerprint
+            entry["duplicate_of"] = None
+        if entry:
+            updates[urlparse(url).netloc][url] = entry
+        return {
+            "url": url,
+            "filename": filename,
+            "status": status,
+            "markdown": None if status == "duplicate" else md_content,
+            "duplicate_of": entry.get("duplicate_of") if entry else None,
+        }
+
+    def settle_duplicates(records):
+        """Assign near-duplicate clusters over the whole batch, in a stable order."""
+        def priority(record):
+            previous = previous_entry(record["url"])
+            was_canonical = bool(previous) and not previous.get("duplicate_of")
+            return (not was_canonical, order[record["url"]])
+
+        index = NearDuplicateIndex()
+        canonical_of = {}
+        for record in sorted(records, key=priority):
+            if record["status"] not in ("added", "changed", "unchanged"):
+                continue
+            entry = updates[urlparse(record["url"]).netloc].get(record["url"])
+            fingerprint = entry.get("minhash") if entry else None
+            if fingerprint is None:
+                continue
+            canonical = index.find(fingerprint)
+            if canonical:
+                entry["duplicate_of"] = canonical
+                canonical_of[record["url"]] = canonical
+                record.update(status="duplicate", markdown=None, duplicate_of=canonical)
+            else:
+                index.add(fingerprint, record["url"])
+
+        for record in records:
+            if record["status"] == "duplicate" and record["duplicate_of"] in canonical_of:
+                # Skipped known duplicate whose canonical turned out to duplicate another page
+                record["duplicate_of"] = canonical_of[record["duplicate_of"]]
+            if record["status"] == "duplicate":
+                previous = previous_entry(record["url"])
+                host = urlparse(record["url"]).netloc
+                if previous and record["url"] not in updates[host]:
+                    updates[host][record["url"]] = dict(previous, duplicate_of=record["duplicate_of"])
+        return sorted(records, key=lambda record: order[record["url"]])
+
+    def timed_out(url):
+        return {
+            "url": url,
+            "filename": sanitize_filename(url + '_error'),
+            "status": "timeout",
+            "markdown": f"Skipped {url}: batch deadline of {deadline_seconds:.0f}s reached",
+            "duplicate_of": None,
+        }
+
+    deadline = time.monotonic() + deadline_seconds
+    deferred = {}
+    to_render = {}
+    executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS)
+    fetcher = None
+    if fetch_backend == "http2" and render_mode != "always":
+        try:
+            fetcher = AsyncFetcher()
+        except ImportError as e:
+            print(f"HTTP/2 backend unavailable, using requests: {str(e)}")
+    try:
+        pending = {}
+
+        def submit(url):
+            if render_mode == "always":
+                to_render[url] = None
+                return
+            if fetcher:
+                future = fetcher.submit(url, previous_entry(url), deadline)
+            else:
+                future = executor.submit(process_webpage_incremental, url, previous_entry(url), deadline)
+            pending[future] = url
+
+        def emit(record):
+            if dedupe:
+                held.append(record)
+                return []
+            return [record]
+
+        def complete(url, result):
+            record = finish(url, *result)
+            yield from emit(record)
+            for duplicate_url in deferred.pop(url, []):
+                if record["status"] == "unchanged":
+                    yield from emit({
+                        "url": duplicate_url,
+                        "filename": previous_entry(duplicate_url)["filename"],
+                        "status": "duplicate",
+                        "markdown": None,
+                        "duplicate_of": url,
+                    })
+                else:
+                    submit(duplicate_url)
+
+        def root_canonical(url):
+            # Follow duplicate_of chains (B -> A -> C) to the page that is actually fetched
+            seen = {url}
+            canonical = url
+            while True:
+                previous = previous_entry(canonical)
+                next_canonical = previous.get("duplicate_of") if previous else None
+                if next_canonical not in batch:
+                    return canonical if canonical != url else None
+                if next_canonical in seen:
+                    return None
+                seen.add(next_canonical)
+                canonical = next_canonical
+
+        for url in urls:
+            canonical = root_canonical(url) if dedupe and skip_known_duplicates else None
+            if canonical:
+                deferred.setdefault(canonical, []).append(url)
+            else:
+                submit(url)
+
+        while pending or to_render:
+            while pending:
+                done, _ = wait(pending, timeout=max(0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+                if not done:
+                    for future, url in pending.items():
+                        future.cancel()
+                        yield from emit(timed_out(url))
+                        for duplicate_url in deferred.pop(url, []):
+                            yield from emit(timed_out(duplicate_url))
+                    pending.clear()
+                    break
+                for future in done:
+                    url = pending.pop(future)
+                    result = future.result()
+                    _, md_content, entry, status = result
+                    if (render_mode == "auto" and status in ("added", "changed", "unchanged")
+                            and (key_content_is_empty(md_content) or (entry or {}).get("rendered"))):
+                        to_render[url] = result
+                    else:
+                        yield from complete(url, result)
+
+            if to_render:
+                render_batch, to_render = to_render, {}
+                for url, md_content, error in iter_rendered_key_content(list(render_batch), deadline):
+                    result = rendered_result(url, md_content, error, render_batch[url], previous_entry(url))
+                    yield from complete(url, result)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        if fetcher:
+            fetcher.close()
+
+    if dedupe:
+        yield from settle_duplicates(held)
+
+    for host in host_urls:
+        removed = []
+        try:
+            removed = save_manifest_entries(host, updates[host], full_list=batch if full_list else None)
+        except Exception as e:
+            print(f"Failed to save manifest for {host}: {str(e)}")
+        for url in removed:
+            yield {"url": url, "filename": None, "status": "removed", "markdown": None, "duplicate_of": None}
+
+def convert_url_batch(urls, dedupe=False, skip_known_duplicates=False, render_mode="auto", full_list=False):
+    """
+    Run iter_convert_urls and collect the results in input order.
+
+    Returns (processed_files, statuses, report) where statuses maps each
+    filename to its run status and report lists added, changed, unchanged,
+    duplicate, removed, failed and timed-out URLs.
+    """
+    order = {url: i for i, url in enumerate(urls)}
+    records = sorted(
+        iter_convert_urls(urls, dedupe, skip_known_duplicates, render_mode, full_list=full_list),
+        key=lambda record: order.get(record["url"], len(order))
+    )
+
+    processed_files = {}
+    statuses = {}
+    report = {"added": [], "changed": [], "unchanged": [], "duplicate": [], "removed": [], "error": [], "timeout": []}
+    for record in records:
+        status = record["status"]
+        if status == "duplicate":
+            report["duplicate"].append(f"{record['url']} (duplicate of {record['duplicate_of']})")
+            continue
+        report[status].append(record["url"])
+        if status != "removed":
+            processed_files[record["filename"]] = record["markdown"]
+            statuses[record["filename"]] = status
+    return processed_files, statuses, report
+
+def format_run_report(report, max_listed=None):
+    summary = ", ".join(f"{len(report[key])} {key}" for key in
+                        ["added", "changed", "unchanged", "duplicate", "removed", "error", "timeout"])
+    lines = [f"Run summary: {summary}"]
+    for key in ["added", "changed", "duplicate", "removed", "error", "timeout"]:
+        urls = report[key] if max_listed is None else report[key][:max_listed]
+        for url in urls:
+            lines.append(f"  [{key}] {url}")
+        if len(report[key]) > len(urls):
+            lines.append(f"  [{key}] ... and {len(report[key]) - len(urls)} more")
+    return "\n".join(lines) + "\n"
+
+# -----------------------------
+# Conversion Results Store
+# -----------------------------
+PREVIEW_PAGE_SIZE = int(os.environ.get("LLMS_PREVIEW_PAGE_SIZE", "20"))
+PREVIEW_LINES = int(os.environ.get("LLMS_PREVIEW_LINES", "8"))
+PREVIEW_REPORT_ENTRIES = 20
+MAX_STORED_RUNS = int(os.environ.get("LLMS_MAX_STORED_RUNS", "20"))
+RUN_TTL = int(os.environ.get("LLMS_RUN_TTL", str(24 * 3600)))
+RUNS_DIR = Path(os.environ.get("LLMS_RUNS_DIR", ".llms_runs"))
+RUN_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+RUN_FILE_GRACE = 600
+
+def run_file_path(digest):
+    return RUNS_DIR / "files" / f"{digest}.md"
+
+def prune_conversion_runs():
+    """
+    Drop runs past RUN_TTL and the oldest beyond MAX_STORED_RUNS, then the
+    markdown files no remaining run refers to.
+    """
+    runs = []
+    for path in RUNS_DIR.iterdir():
+        if path.is_dir() and RUN_ID_PATTERN.match(path.name):
+            try:
+                runs.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                pass
+    runs.sort(reverse=True)
+    now = time.time()
+    for i, (mtime, path) in enumerate(runs):
+        if i >= MAX_STORED_RUNS or now - mtime > RUN_TTL:
+            shutil.rmtree(path, ignore_errors=True)
+
+    referenced = set()
+    for run_dir in RUNS_DIR.iterdir():
+        if run_dir.is_dir() and RUN_ID_PATTERN.match(run_dir.name):
+            try:
+                with open(run_dir / "index.json", encoding="utf-8") as f:
+                    referenced.update(json.load(f)["hashes"])
+            except (FileNotFoundError, ValueError, KeyError):
+                continue
+    for path in (RUNS_DIR / "files").glob("*.md"):
+        try:
+            # Recently written or reused files may belong to a run that is still being stored
+            if path.stem not in referenced and now - path.stat().st_mtime > RUN_FILE_GRACE:
+                path.unlink()
+        except FileNotFoundError:
+            pass
+
+def store_conversion_run(processed_files, statuses, report):
+    """
+    Write a run's full results to disk and return its id.
+
+    Runs live under RUNS_DIR so every worker process can serve the preview,
+    viewer and download for a run converted by another worker. Markdown is
+    stored once per distinct content and shared between runs, so a run
+    only writes the files that are new or changed since earlier runs.
+    """
+    (RUNS_DIR / "files").mkdir(parents=True, exist_ok=True)
+    run_id = uuid.uuid4().hex
+    filenames = list(processed_files)
+    hashes = []
+    for filename in filenames:
+        content = processed_files[filename] or ""
+        digest = content_hash(content)
+        path = run_file_path(digest)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            with tempfile.NamedTemporaryFile("w", dir=path.parent, suffix=".tmp", encoding="utf-8",
+                                             delete=False) as f:
+                f.write(content)
+            os.replace(f.name, path)
+        hashes.append(digest)
+
+    tmp_dir = Path(tempfile.mkdtemp(dir=RUNS_DIR, prefix=".tmp-"))
+    try:
+        with open(tmp_dir / "index.json", "w", encoding="utf-8") as f:
+            json.dump({"filenames": filenames, "hashes": hashes, "statuses": statuses, "report": report}, f)
+        os.replace(tmp_dir, RUNS_DIR / run_id)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    try:
+        prune_conversion_runs()
+    except Exception as e:
+        print(f"Failed to prune stored conversion runs: {str(e)}")
+    return run_id
+
+def get_conversion_run(run_id):
+    """Load a stored run's index, or None if it is unknown or expired."""
+    if not run_id or not RUN_ID_PATTERN.match(run_id):
+        return None
+    run_dir = RUNS_DIR / run_id
+    try:
+        if time.time() - run_dir.stat().st_mtime > RUN_TTL:
+            return None
+        with open(run_dir / "index.json", encoding="utf-8") as f:
+            run = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    run["positions"] = {filename: i for i, filename in enumerate(run["filenames"])}
+    return run
+
+def read_run_file(run, filename):
+    """Markdown content of one file in a stored run ("" if missing)."""
+    position = run["positions"].get(filename)
+    if position is None:
+        return ""
+    try:
+        return run_file_path(run["hashes"][position]).read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return ""
+
+def format_preview_page(run, page):
+    """Compact index for one page of a run: name, size, status and first lines."""
+    filenames = run["filenames"]
+    start = (page - 1) * PREVIEW_PAGE_SIZE
+    lines = [
+        format_run_report(run["report"], max_listed=PREVIEW_REPORT_ENTRIES),
+        f"Files {start + 1}-{min(start + PREVIEW_PAGE_SIZE, len(filenames))} of {len(filenames)}",
+        ""
+    ]
+    for filename in filenames[start:start + PREVIEW_PAGE_SIZE]:
+        content = read_run_file(run, filename)
+        size = len(content.encode("utf-8"))
+        lines.append(f"File: {filename} ({run['statuses'][filename]}, {size:,} bytes)")
+        content_lines = content.splitlines()
+        lines.extend(f"    {line}" for line in content_lines[:PREVIEW_LINES])
+        if len(content_lines) > PREVIEW_LINES:
+            lines.append(f"    ... {len(content_lines) - PREVIEW_LINES} more lines")
+        lines.append("---")
+    return "\n".join(lines)
+
+# -----------------------------
+# Overlay Handling
+# -----------------------------
+CONSENT_MANAGER_SELECTORS = [
+    ("OneTrust", "#onetrust-accept-btn-handler"),
+    ("Cookiebot", "#CybotCookiebotDialogBodyLevelButtonLevelOptinAllowAll, #CybotCookiebotDialogBodyButtonAccept"),
+    ("Didomi", "#didomi-notice-agree-button"),
+    ("TrustArc", "#truste-consent-button, .trustarc-agree-btn"),
+    ("Quantcast", ".qc-cmp2-summary-buttons button[mode='primary']"),
+    ("Usercentrics", "[data-testid='uc-accept-all-button']"),
+    ("Osano", ".osano-cm-accept-all"),
+    ("CookieYes", ".cky-btn-accept"),
+    ("Complianz", ".cmplz-btn.cmplz-accept"),
+    ("iubenda", ".iubenda-cs-accept-btn"),
+    ("Termly", "[data-tid='banner-accept']"),
+]
+OVERLAY_DISMISS_TIMEOUT = 3000
+OVERLAY_MAX_ROUNDS = 3
+
+# Finds every visible candidate in one pass and tags it for clicking; an element
+# matched by several candidates (e.g. a user selector naming a known consent
+# button) is only tagged for the first of them
+DETECT_OVERLAYS_JS = """
+(candidates) => {
+    document.querySelectorAll('[data-llms-overlay]').forEach(el => el.removeAttribute('data-llms-overlay'));
+    const isVisible = (el) => {
+        const style = window.getComputedStyle(el);
+        return style.visibility !== 'hidden' && style.display !== 'none' &&
+               parseFloat(style.opacity || '1') > 0 && el.getClientRects().length > 0;
+    };
+    const found = [];
+    const invalid = [];
+    const claimed = new Set();
+    candidates.forEach(([name, selector], index) => {
+        let elements;
+        try {
+            elements = document.querySelectorAll(selector);
+        } catch (e) {
+            invalid.push(index);
+            return;
+        }
+        const el = Array.from(elements).find(el => !claimed.has(el) && isVisible(el));
+        if (el) {
+            claimed.add(el);
+            el.setAttribute('data-llms-overlay', String(index));
+            found.push(index);
+        }
+    });
+    return {found, invalid};
+}
+"""
+
+OVERLAY_GONE_JS = """
+(index) => {
+    const el = document.querySelector(`[data-llms-overlay="${index}"]`);
+    return !el || !el.isConnected || el.getClientRects().length === 0 ||
+           window.getComputedStyle(el).visibility === 'hidden';
+}
+"""
+
+def dismiss_overlays(page, user_selectors):
+    """
+    Detect and dismiss overlays without blind timeouts.
+
+    User selectors and known consent-manager buttons are checked together
+    in a single page evaluation; only visible matches are clicked, and each
+    dismissal is confirmed by waiting for the button to leave the DOM or
+    become hidden. Returns the names of the overlays that were handled.
+    """
+    candidates = [(f"user selector {sel}", sel) for sel in user_selectors] + CONSENT_MANAGER_SELECTORS
+    handled = []
+    for _ in range(OVERLAY_MAX_ROUNDS):
+        detected = page.evaluate(DETECT_OVERLAYS_JS, [list(c) for c in candidates])
+        targets = [(index, f'[data-llms-overlay="{index}"]') for index in detected["found"]]
+
+        # Selectors the DOM cannot parse (e.g. Playwright text= selectors) are checked individually
+        for index in detected["invalid"]:
+            try:
+                if page.locator(candidates[index][1]).first.is_visible():
+                    targets.append((index, candidates[index][1]))
+            except Exception:
+                continue
+
+        if not targets:
+            break
+        for index, selector in targets:
+            name = candidates[index][0]
+            try:
+                # An earlier click may already have hidden this target along with its banner
+                if not page.locator(selector).first.is_visible():
+                    continue
+                page.locator(selector).first.click(timeout=OVERLAY_DISMISS_TIMEOUT)
+                if selector.startswith("[data-llms-overlay"):
+                    page.wait_for_function(OVERLAY_GONE_JS, arg=index, timeout=OVERLAY_DISMISS_TIMEOUT)
+                else:
+                    page.locator(selector).first.wait_for(state="hidden", timeout=OVERLAY_DISMISS_TIMEOUT)
+                print(f"Dismissed {name} overlay")
+                handled.append(name)
+            except Exception as e:
+                print(f"Could not dismiss {name} overlay: {str(e)}")
+                candidates[index] = (name, ":not(*)")
+    return handled
+
+# -----------------------------
+# Browser Storage State Cache
+# -----------------------------
+STORAGE_STATE_DIR = Path(os.environ.get("LLMS_STORAGE_STATE_DIR", ".llms_storage_state"))
+STORAGE_STATE_TTL = float(os.environ.get("LLMS_STORAGE_STATE_TTL", str(7 * 24 * 3600)))
+
+def storage_state_path(url):
+    safe_host = re.sub(r'[^\w\-.]', '_', urlparse(url).netloc)
+    return STORAGE_STATE_DIR / f"{safe_host}.json"
+
+def load_storage_state(url):
+    """Return the cached storage state file for url's domain if it has not expired."""
+    path = storage_state_path(url)
+    try:
+        age = time.time() - path.stat().st_mtime
+    except FileNotFoundError:
+        return None
+    if age > STORAGE_STATE_TTL:
+        invalidate_storage_state(url)
+        return None
+    return path
+
+def save_storage_state(context, url):
+    """Persist cookies and localStorage captured after overlays were dismissed."""
+    try:
+        state = context.storage_state()
+        STORAGE_STATE_DIR.mkdir(parents=True, exist_ok=True)
+        # Unique temp file, since extractions for the same domain can run at once
+        with tempfile.NamedTemporaryFile("w", dir=STORAGE_STATE_DIR, suffix=".tmp", encoding="utf-8",
+                                         delete=False) as f:
+            tmp_path = f.name
+            try:
+                json.dump(state, f)
+            except BaseException:
+                f.close()
+                os.unlink(tmp_path)
+                raise
+        os.replace(tmp_path, storage_state_path(url))
+    except Exception as e:
+        print(f"Failed to save storage state for {url}: {str(e)}")
+
+def invalidate_storage_state(url):
+    try:
+        storage_state_path(url).unlink()
+    except FileNotFoundError:
+        pass
+
+NAV_WAIT_TIMEOUT = 10000
+NAV_RETRY_WAIT_TIMEOUT = 3000
+# Navigation containers tried after the user's root selector, by both the
+# readiness wait and the extractor
+NAV_ROOT_SELECTORS = [
+    'nav',
+    'header nav',
+    '[role="navigation"]',
+    '[data-test*="nav"]',
+    '[data-testid*="nav"]',
+    '[aria-label*="navigation"]',
+    '[class*="nav"]',
+    '[id*="nav"]',
+]
+NAV_READY_JS = """
+([rootSelector, contextSelector, rootSelectors]) => {
+    const clickable = (contextSelector && contextSelector.trim().length > 0) ? contextSelector : 'a[href]';
+    const roots = document.querySelectorAll([rootSelector, ...rootSelectors].filter(Boolean).join(','));
+    return Array.from(roots).some(root => root.querySelector(clickable));
+}
+"""
+
+def wait_for_nav(page, root_nav_selector, context_sel, timeout):
+    """Wait until a navigation root the extractor would use holds a link; False on timeout."""
+    try:
+        page.wait_for_function(NAV_READY_JS, arg=[root_nav_selector, context_sel, NAV_ROOT_SELECTORS],
+                               timeout=timeout)
+        return True
+    except Exception as e:
+        print(f"Navigation not ready after {timeout}ms: {str(e)}")
+        return False
+
 def extract_nav_sync(homepage_url, age_gate_sel=None, cookie_sel=None, root_nav_selector=None, context_sel=None):
     """Synchronous navigation extraction with JS evaluation"""
     js_code = """
-    function extractNavigation([rootSelector, contextSelector]) {
+    function extractNavigation([rootSelector, contextSelector, rootSelectors]) {
         const clickableSelector = (contextSelector && contextSelector.trim().length > 0) ? 
             contextSelector : 'a[href]';
         
@@ -248,14 +1768,7 @@ def extract_nav_sync(homepage_url, age_gate_sel=None, cookie_sel=None, root_nav_
         const getRootElements = () => {
             const selectors = [
                 rootSelector,
-                'nav', 
-                'header nav',
-                '[role="navigation"]',
-                '[data-test*="nav"]',
-                '[data-testid*="nav"]',
-                '[aria-label*="navigation"]',
-                '[class*="nav"]',
-                '[id*="nav"]',
+                ...rootSelectors,
                 isLego ? '[data-test="desktop-navigation"]' : null,
                 isShopify ? '[data-sectiontype="header"]' : null
             ].filter(Boolean);
@@ -337,44 +1850,48 @@ def extract_nav_sync(homepage_url, age_gate_sel=None, cookie_sel=None, root_nav_
     playwright, browser = None, None
     try:
         playwright, browser = get_browser_instance()
-        context = browser.new_context()
+        overlay_selectors = [sel for sel in [age_gate_sel, cookie_sel] if sel]
+        state_path = load_storage_state(homepage_url)
+        context = None
+        if state_path:
+            try:
+                context = browser.new_context(storage_state=str(state_path))
+            except Exception as e:
+                print(f"Discarding unusable storage state for {homepage_url}: {str(e)}")
+                invalidate_storage_state(homepage_url)
+                state_path = None
+        if context is None:
+            context = browser.new_context()
         page = context.new_page()
         
         # Load the page
         page.goto(homepage_url, wait_until="networkidle", timeout=90000)
-        page.wait_for_timeout(3000)
-        
-        # Handle overlays
-        def dismiss_overlays():
-            selectors = [sel for sel in [age_gate_sel, cookie_sel] if sel]
-            for selector in selectors:
-                try:
-                    page.click(selector, timeout=5000)
-                    page.wait_for_timeout(1000)
-                except:
-                    continue
         
-        dismiss_overlays()
+        # Handle overlays, refreshing the cached state whenever one was shown
+        if dismiss_overlays(page, overlay_selectors):
+            if state_path:
+                print(f"Stored storage state no longer satisfies overlays for {homepage_url}")
+            save_storage_state(context, homepage_url)
+        wait_for_nav(page, root_nav_selector, context_sel, NAV_WAIT_TIMEOUT)
         
         # Execute JS extraction
         tree = []
         max_attempts = 3
         for attempt in range(max_attempts):
             try:
-                tree = page.evaluate(js_code, [root_nav_selector, context_sel])
+                tree = page.evaluate(js_code, [root_nav_selector, context_sel, NAV_ROOT_SELECTORS])
                 if tree and len(tree) > 0:
                     break
-                page.wait_for_timeout(2000)
-                if attempt == 1:
-                    page.keyboard.press('Tab')
-                    page.wait_for_timeout(500)
-                    page.keyboard.press('Enter')
-                    page.wait_for_timeout(1000)
+                if dismiss_overlays(page, overlay_selectors):
+                    save_storage_state(context, homepage_url)
+                wait_for_nav(page, root_nav_selector, context_sel, NAV_RETRY_WAIT_TIMEOUT)
             except Exception as e:
                 print(f"Attempt {attempt + 1} failed: {str(e)}")
                 if attempt == max_attempts - 1:
                     raise
         
+        if not tree and state_path:
+            invalidate_storage_state(homepage_url)
         return tree if tree else []
         
     except Exception as e:
@@ -685,6 +2202,31 @@ dbc.Accordion([
                             )
                         ])
                     ]),
+                    dbc.Row([
+                        dbc.Col([
+                            dbc.Checklist(
+                                id="url-convert-options",
+                                options=[
+                                    {"label": "Drop near-duplicate pages", "value": "dedupe"},
+                                    {"label": "Skip pages that were duplicates last run", "value": "skip-known-duplicates"},
+                                    {"label": "This is the full URL list (report removed pages)", "value": "full-list"}
+                                ],
+                                value=[],
+                                inline=True,
+                                className="mt-2"
+                            ),
+                            dbc.RadioItems(
+                                id="render-mode",
+                                options=[
+                                    {"label": "Static HTML only", "value": "off"},
+                                    {"label": "Render JS when static content is empty", "value": "auto"},
+                                    {"label": "Always render JS", "value": "always"}
+                                ],
+                                value="auto",
+                                inline=True
+                            )
+                        ])
+                    ]),
                     dbc.Row([
                         dbc.Col([
                             dbc.Button(
@@ -706,9 +2248,38 @@ dbc.Accordion([
                                     "fontFamily": "monospace"
                                 },
                                 readOnly=True
+                            ),
+                            dbc.Pagination(
+                                id="converted-urls-page",
+                                max_value=1,
+                                active_page=1,
+                                fully_expanded=False,
+                                className="mt-2"
                             )
                         ])
                     ]),
+                    dbc.Row([
+                        dbc.Col([
+                            dbc.Label("View a converted file"),
+                            dcc.Dropdown(
+                                id="converted-file-select",
+                                placeholder="Type to search converted files...",
+                                options=[],
+                                className="mb-2"
+                            ),
+                            dcc.Textarea(
+                                id="converted-file-content",
+                                placeholder="Select a file to view its full markdown...",
+                                style={
+                                    "width": "100%", 
+                                    "height": "300px",
+                                    "fontFamily": "monospace"
+                                },
+                                readOnly=True
+                            )
+                        ])
+                    ]),
+                    dcc.Store(id="conversion-run-id"),
                     dbc.Row([
                         dbc.Col([
                             dbc.Button(
@@ -769,20 +2340,7 @@ def handle_nav_actions(extract_clicks, edit_clicks, homepage_url, age_gate_sel,
                 return ("No navigation structure found. Try different selectors.", 
                         True, "📝 Edit Preview", True, True, True)
             
-            md_tree = format_tree_md(tree, homepage_url)
-            homepage_title, homepage_meta = get_homepage_info(homepage_url)
-            
-            md_lines = [
-                f"# {homepage_title}",
-                "",
-                f"> {homepage_meta}",
-                "",
-                "## Navigation",
-                "",
-                md_tree
-            ]
-            
-            llms_md = "\n".join(md_lines)
+            llms_md = build_llms_txt(homepage_url, tree)
             return (llms_md, True, "📝 Edit Preview", False, False, False)
         
         except Exception as e:
@@ -831,40 +2389,79 @@ def convert_links_callback(n_clicks, input_text):
     if not converted:
         return "No valid links found."
 
-    output_lines = [f"- [{text}]({url})" for url, text in converted.items()]
-    return "\n".join(output_lines)
+    return format_structured_links(converted)
 
 @app.callback(
-    [Output("converted-urls", "value"),
+    [Output("conversion-run-id", "data"),
+     Output("converted-urls-page", "max_value"),
+     Output("converted-urls-page", "active_page"),
+     Output("converted-file-select", "value"),
      Output("download-md-btn", "disabled")],
     Input("convert-urls-btn", "n_clicks"),
-    State("input-urls", "value"),
+    [State("input-urls", "value"),
+     State("url-convert-options", "value"),
+     State("render-mode", "value")],
     prevent_initial_call=True
 )
-def convert_urls_to_markdown(n_clicks, input_urls):
-    if not input_urls.strip():
-        return "No URLs provided.", True
+def convert_urls_to_markdown(n_clicks, input_urls, options, render_mode):
+    if not input_urls or not input_urls.strip():
+        return None, 1, 1, None, True
 
-    urls = []
-    for line in input_urls.splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        match = re.search(r'\[.*?\]\((.*?)\)', line)
-        if match:
-            urls.append(match.group(1))
-        elif line.startswith(('http://', 'https://')):
-            urls.append(line)
+    urls = parse_url_lines(input_urls)
+    options = options or []
+    processed_files, statuses, report = convert_url_batch(
+        urls,
+        dedupe="dedupe" in options,
+        skip_known_duplicates="skip-known-duplicates" in options,
+        full_list="full-list" in options,
+        render_mode=render_mode or "auto"
+    )
+    run_id = store_conversion_run(processed_files, statuses, report)
+    pages = max(1, -(-len(processed_files) // PREVIEW_PAGE_SIZE))
+    return run_id, pages, 1, None, not processed_files
 
-    processed_files = {}
-    converted_content = []
-    for url in urls:
-        filename, md_content = process_webpage_to_markdown(url)
-        processed_files[filename] = md_content
-        converted_content.append(f"File: {filename}\n{md_content}\n---\n")
+@app.callback(
+    Output("converted-urls", "value"),
+    [Input("conversion-run-id", "data"),
+     Input("converted-urls-page", "active_page")],
+    prevent_initial_call=True
+)
+def show_conversion_page(run_id, page):
+    if not run_id:
+        return "No URLs provided."
+    run = get_conversion_run(run_id)
+    if run is None:
+        return "These results have expired. Convert the URLs again."
+    return format_preview_page(run, page or 1)
+
+@app.callback(
+    Output("converted-file-select", "options"),
+    [Input("conversion-run-id", "data"),
+     Input("converted-file-select", "search_value")],
+    State("converted-file-select", "value"),
+    prevent_initial_call=True
+)
+def search_converted_files(run_id, search_value, selected):
+    run = get_conversion_run(run_id)
+    if run is None:
+        return []
+    search = (search_value or "").lower()
+    matches = [name for name in run["filenames"] if search in name.lower()][:PREVIEW_PAGE_SIZE]
+    if selected and selected not in matches:
+        matches.insert(0, selected)
+    return [{"label": name, "value": name} for name in matches]
 
-    app.server.processed_markdown_files = processed_files
-    return "\n".join(converted_content), False
+@app.callback(
+    Output("converted-file-content", "value"),
+    Input("converted-file-select", "value"),
+    State("conversion-run-id", "data"),
+    prevent_initial_call=True
+)
+def show_converted_file(filename, run_id):
+    run = get_conversion_run(run_id)
+    if not filename or run is None:
+        return ""
+    return read_run_file(run, filename)
 
 @app.callback(
     Output("download-nav", "data"),
@@ -880,27 +2477,186 @@ def download_nav_file(n_clicks, content):
 @app.callback(
     Output("download-md", "data"),
     Input("download-md-btn", "n_clicks"),
+    State("conversion-run-id", "data"),
     prevent_initial_call=True
 )
-def download_md_files(n_clicks):
-    processed_files = getattr(app.server, 'processed_markdown_files', {})
-    if not processed_files:
+def download_md_files(n_clicks, run_id):
+    run = get_conversion_run(run_id)
+    filenames = run["filenames"] if run else []
+    if not filenames:
         return None
 
-    if len(processed_files) == 1:
-        filename, content = next(iter(processed_files.items()))
-        return dict(content=content, filename=filename)
+    if len(filenames) == 1:
+        return dict(content=read_run_file(run, filenames[0]), filename=filenames[0])
 
     import io, zipfile
     zip_buffer = io.BytesIO()
     with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        for filename, content in processed_files.items():
-            zip_file.writestr(filename, content)
+        for filename in filenames:
+            zip_file.writestr(filename, read_run_file(run, filename))
     zip_buffer.seek(0)
 
     encoded_zip = base64.b64encode(zip_buffer.read()).decode('utf-8')
     return dict(content=encoded_zip, filename="webpage_markdown_files.zip", base64=True)
 
+# -----------------------------
+# JSON API
+# -----------------------------
+API_MAX_CONCURRENCY = int(os.environ.get("LLMS_API_MAX_CONCURRENCY", "4"))
+API_MAX_BODY_BYTES = int(os.environ.get("LLMS_API_MAX_BODY_BYTES", str(10 * 1024 * 1024)))
+api_slots = threading.BoundedSemaphore(API_MAX_CONCURRENCY)
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+def read_json_body():
+    """
+    Parse the JSON request body, accepting gzip Content-Encoding.
+
+    Both the body on the wire and the decompressed body are capped at
+    LLMS_API_MAX_BODY_BYTES without buffering anything beyond the cap.
+    """
+    if request.content_length is not None and request.content_length > API_MAX_BODY_BYTES:
+        raise ApiError("Request body too large", 413)
+    chunks = []
+    size = 0
+    while size <= API_MAX_BODY_BYTES:
+        chunk = request.stream.read(min(64 * 1024, API_MAX_BODY_BYTES + 1 - size))
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+    data = b"".join(chunks)
+    if size > API_MAX_BODY_BYTES:
+        raise ApiError("Request body too large", 413)
+    if request.headers.get("Content-Encoding", "").lower() == "gzip":
+        try:
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            data = decompressor.decompress(data, API_MAX_BODY_BYTES + 1)
+        except zlib.error as e:
+            raise ApiError(f"Invalid gzip body: {str(e)}")
+    if len(data) > API_MAX_BODY_BYTES:
+        raise ApiError("Request body too large", 413)
+    try:
+        payload = json.loads(data or b"{}")
+    except ValueError as e:
+        raise ApiError(f"Invalid JSON body: {str(e)}")
+    if not isinstance(payload, dict):
+        raise ApiError("JSON body must be an object")
+    return payload
+
+def api_route(rule, methods=("POST",)):
+    """
+    Register a JSON API route on the Flask server.
+
+    Requests beyond LLMS_API_MAX_CONCURRENCY are rejected with 429. A view
+    returning a generator keeps its slot until the stream is finished.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not api_slots.acquire(blocking=False):
+                resp = jsonify({"error": "Too many concurrent API requests"})
+                resp.status_code = 429
+                resp.headers["Retry-After"] = "1"
+                return resp
+            streaming = False
+            try:
+                result = view(*args, **kwargs)
+                if isinstance(result, Response) and result.is_streamed:
+                    streaming = True
+                return result
+            except ApiError as e:
+                resp = jsonify({"error": str(e)})
+                resp.status_code = e.status
+                return resp
+            finally:
+                if not streaming:
+                    api_slots.release()
+        return server.route(rule, methods=list(methods), endpoint=f"api_{view.__name__}")(wrapper)
+    return decorator
+
+def ndjson_response(records):
+    """Stream records as NDJSON, releasing the API slot when the response closes."""
+    resp = Response((json.dumps(record) + "\n" for record in records), mimetype="application/x-ndjson")
+    resp.call_on_close(api_slots.release)
+    return resp
+
+@api_route("/api/navigation")
+def api_navigation():
+    payload = read_json_body()
+    homepage_url = payload.get("url")
+    root_nav_selector = payload.get("root_selector")
+    if not homepage_url or not validate_url(homepage_url) or not root_nav_selector:
+        raise ApiError("Provide a valid 'url' and 'root_selector'")
+
+    tree = extract_nav_sync(
+        homepage_url,
+        payload.get("age_gate_selector"),
+        payload.get("cookie_selector"),
+        root_nav_selector,
+        payload.get("context_selector")
+    )
+    return jsonify({
+        "url": homepage_url,
+        "tree": tree,
+        "llms_txt": build_llms_txt(homepage_url, tree) if tree else None
+    })
+
+@api_route("/api/links")
+def api_links():
+    payload = read_json_body()
+    text = payload.get("text")
+    if not isinstance(text, str) or not text:
+        raise ApiError("Provide 'text' containing links")
+
+    converted = convert_links_to_structured(text)
+    return jsonify({
+        "links": [{"title": title, "url": url} for url, title in converted.items()],
+        "llms_txt": format_structured_links(converted)
+    })
+
+@api_route("/api/convert")
+def api_convert():
+    """Convert URLs to markdown, streaming one NDJSON record per URL as it finishes."""
+    payload = read_json_body()
+    urls = payload.get("urls")
+    if isinstance(payload.get("text"), str):
+        urls = parse_url_lines(payload["text"])
+    if not isinstance(urls, list) or not urls:
+        raise ApiError("Provide 'urls' as a list or 'text' with one URL per line")
+    urls = [url for url in urls if isinstance(url, str) and validate_url(url)]
+    if not urls:
+        raise ApiError("No valid URLs provided")
+
+    render_mode = payload.get("render_mode", "auto")
+    if render_mode not in ("off", "auto", "always"):
+        raise ApiError("'render_mode' must be one of off, auto, always")
+    try:
+        deadline_seconds = min(float(payload.get("deadline", BATCH_DEADLINE)), BATCH_DEADLINE)
+    except (TypeError, ValueError):
+        raise ApiError("'deadline' must be a number of seconds")
+
+    fetch_backend = payload.get("fetch_backend", FETCH_BACKEND)
+    if fetch_backend not in ("requests", "http2"):
+        raise ApiError("'fetch_backend' must be one of requests, http2")
+
+    return ndjson_response(iter_convert_urls(
+        urls,
+        dedupe=bool(payload.get("dedupe")),
+        skip_known_duplicates=bool(payload.get("skip_known_duplicates")),
+        render_mode=render_mode,
+        deadline_seconds=deadline_seconds,
+        fetch_backend=fetch_backend,
+        full_list=bool(payload.get("full_list"))
+    ))
+
+@api_route("/api/stats", methods=("GET",))
+def api_stats():
+    return jsonify({"hosts": fetch_scheduler.stats()})
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8050))
     app.run(host='0.0.0.0', port=port)
@@ -0,0 +1,147 @@
+"""
+Benchmark the requests and HTTP/2 fetch backends for batch URL conversion.
+
+Serves the load-test fixture site over TLS from a local hypercorn server
+(which negotiates HTTP/2 via ALPN) and converts the same batch of same-host
+URLs with each backend. Reports throughput, the number of TCP connections
+the server saw and the HTTP versions used. Needs hypercorn and the openssl
+CLI in addition to the app's requirements.
+
+Example:
+    python bench_http2.py --pages 500 --latency 0.05
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from loadtest import fixture_page
+
+class FixtureApp:
+    """ASGI fixture site that records which connections and HTTP versions were used."""
+
+    def __init__(self, pages, latency):
+        self.pages = pages
+        self.latency = latency
+        self.reset()
+
+    def reset(self):
+        self.connections = set()
+        self.http_versions = {}
+        self.requests = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+
+        self.requests += 1
+        self.connections.add(tuple(scope["client"] or ()))
+        version = scope["http_version"]
+        self.http_versions[version] = self.http_versions.get(version, 0) + 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        content_type, content = fixture_page(scope["path"], self.pages)
+        status = 200 if content is not None else 404
+        body = (content or "Not Found").encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", (content_type or "text/plain").encode()),
+                        (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+def make_certificate(directory):
+    certfile = os.path.join(directory, "cert.pem")
+    keyfile = os.path.join(directory, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-keyout", keyfile, "-out", certfile, "-subj", "/CN=localhost",
+         "-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1"],
+        check=True, capture_output=True
+    )
+    return certfile, keyfile
+
+def start_server(fixture, port, certfile, keyfile):
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config
+
+    config = Config()
+    config.bind = [f"127.0.0.1:{port}"]
+    config.certfile = certfile
+    config.keyfile = keyfile
+    config.alpn_protocols = ["h2", "http/1.1"]
+    config.accesslog = None
+    config.errorlog = None
+    ready = threading.Event()
+
+    def run():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+        loop.run_until_complete(serve(fixture, config))
+
+    threading.Thread(target=run, daemon=True).start()
+    ready.wait()
+    time.sleep(1)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=300, help="URLs per batch")
+    parser.add_argument("--latency", type=float, default=0.05, help="server delay per response in seconds")
+    parser.add_argument("--port", type=int, default=8443)
+    parser.add_argument("--host-concurrency", type=int, default=32, help="LLMS_HOST_MAX_CONCURRENCY for the run")
+    parser.add_argument("--backends", default="requests,http2")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="llms-bench-")
+    certfile, keyfile = make_certificate(workdir)
+    fixture = FixtureApp(args.pages, args.latency)
+    start_server(fixture, args.port, certfile, keyfile)
+
+    # Trust the self-signed certificate in both clients and lift politeness limits before importing the app
+    os.environ.update(
+        REQUESTS_CA_BUNDLE=certfile,
+        SSL_CERT_FILE=certfile,
+        LLMS_HOST_RATE="100000",
+        LLMS_HOST_BURST="100000",
+        LLMS_HOST_MAX_CONCURRENCY=str(args.host_concurrency),
+        LLMS_BATCH_WORKERS=str(args.host_concurrency),
+    )
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import app
+
+    urls = [f"https://127.0.0.1:{args.port}/page/{i}" for i in range(args.pages)]
+    results = []
+    for backend in args.backends.split(","):
+        app.MANIFEST_DIR = app.Path(tempfile.mkdtemp(dir=workdir))
+        app.fetch_scheduler = app.HostScheduler()
+        app.fetch_scheduler._state(f"127.0.0.1:{args.port}").concurrency = float(args.host_concurrency)
+        fixture.reset()
+
+        started = time.monotonic()
+        records = list(app.iter_convert_urls(urls, render_mode="off", fetch_backend=backend))
+        elapsed = time.monotonic() - started
+
+        converted = sum(1 for record in records if record["status"] == "added")
+        results.append((backend, converted, elapsed, len(fixture.connections), dict(fixture.http_versions)))
+
+    print(f"{'backend':<10}{'pages':>7}{'seconds':>9}{'pages/s':>9}{'connections':>13}  http versions")
+    for backend, converted, elapsed, connections, versions in results:
+        print(f"{backend:<10}{converted:>7}{elapsed:>9.2f}{converted / elapsed:>9.1f}{connections:>13}  {versions}")
+
+if __name__ == "__main__":
+    main()
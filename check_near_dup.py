@@ -0,0 +1,102 @@
+"""
+Check near-duplicate detection on short, key-content-sized pages.
+
+Clusters a localized page pair (en-us / en-gb spelling, currency and
+country differences) and an unrelated page from the same site, then
+measures how often randomly perturbed texts of typical extracted lengths
+cluster with their original. Exits non-zero if the localized pair is not
+clustered or an unrelated page is.
+
+Example:
+    python check_near_dup.py --trials 200
+"""
+import argparse
+import os
+import random
+import sys
+
+EN_US = """
+# Trail Running Shoes | Summit Outfitters
+Lightweight trail running shoes with a grippy outsole, available in three colors.
+## Built for rough terrain
+Our trail running shoes combine a rock plate with a cushioned midsole, so you can run longer on technical ground without feeling every stone.
+## Fit and sizing
+The shoes fit true to size. If you are between sizes, we recommend going half a size up for long runs and downhill sections.
+## Shipping
+Free shipping on orders over $75 within the United States. Orders placed before 2pm ship the same day.
+Returns are free within 30 days. Questions? Contact our customer service team.
+"""
+
+EN_GB = """
+# Trail Running Shoes | Summit Outfitters
+Lightweight trail running shoes with a grippy outsole, available in three colours.
+## Built for rough terrain
+Our trail running shoes combine a rock plate with a cushioned midsole, so you can run longer on technical ground without feeling every stone.
+## Fit and sizing
+The shoes fit true to size. If you are between sizes, we recommend going half a size up for long runs and downhill sections.
+## Delivery
+Free delivery on orders over £60 within the United Kingdom. Orders placed before 2pm ship the same day.
+Returns are free within 30 days. Questions? Contact our customer service team.
+"""
+
+UNRELATED = """
+# Waterproof Hiking Jackets | Summit Outfitters
+Three-layer waterproof jackets for hiking and mountaineering in wet weather.
+## Stay dry all day
+A breathable membrane keeps rain out while letting sweat escape, and taped seams stop water creeping in at the shoulders.
+## Layering
+Cut with room for a fleece underneath. The helmet-compatible hood adjusts with a single pull at the back.
+## Shipping
+Free shipping on orders over $75 within the United States. Orders placed before 2pm ship the same day.
+Returns are free within 30 days. Questions? Contact our customer service team.
+"""
+
+def perturbed_pair(rng, vocabulary, tokens, changes):
+    original = rng.choices(vocabulary, k=tokens)
+    variant = list(original)
+    for i in rng.sample(range(tokens), changes):
+        variant[i] = rng.choice(vocabulary)
+    return " ".join(original), " ".join(variant)
+
+def cluster_rate(app, rng, vocabulary, tokens, changes, trials):
+    clustered = 0
+    for _ in range(trials):
+        original, variant = perturbed_pair(rng, vocabulary, tokens, changes)
+        index = app.NearDuplicateIndex()
+        index.add(app.minhash(original), "original")
+        clustered += index.find(app.minhash(variant)) == "original"
+    return clustered / trials
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trials", type=int, default=200, help="random pairs per case")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import app
+
+    index = app.NearDuplicateIndex()
+    index.add(app.minhash(EN_US), "/en-us")
+    localized = index.find(app.minhash(EN_GB))
+    unrelated = index.find(app.minhash(UNRELATED))
+    print(f"en-gb vs en-us: similarity {app.minhash_similarity(app.minhash(EN_US), app.minhash(EN_GB)):.2f}, "
+          f"clustered with {localized}")
+    print(f"unrelated vs en-us: similarity {app.minhash_similarity(app.minhash(EN_US), app.minhash(UNRELATED)):.2f}, "
+          f"clustered with {unrelated}")
+
+    rng = random.Random(args.seed)
+    vocabulary = [f"word{i}" for i in range(2000)]
+    print(f"{'tokens':>7}{'changed':>9}{'clustered':>11}")
+    for tokens in (50, 150):
+        for changes in (1, 5):
+            rate = cluster_rate(app, rng, vocabulary, tokens, changes, args.trials)
+            print(f"{tokens:>7}{changes:>9}{rate:>10.0%}")
+        rate = cluster_rate(app, rng, vocabulary, tokens, tokens, args.trials)
+        print(f"{tokens:>7}{'all':>9}{rate:>10.0%}")
+
+    if localized != "/en-us" or unrelated is not None:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,395 @@
+"""
+Load-test harness for the LLMS Generator Toolkit.
+
+Starts a local fixture site and the app under gunicorn, fires concurrent
+Dash callback requests for all three tabs at increasing rates, and samples
+worker RSS and Chromium process counts. Prints a capacity report and writes
+it as JSON. Runs fully offline (Linux only, since it reads /proc); the
+navigation scenario needs the Playwright Chromium build installed.
+
+Example:
+    python loadtest.py --workers 2 --rates 1,2,4,8 --duration 30
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+# -----------------------------
+# Fixture Site
+# -----------------------------
+def fixture_page(path, pages):
+    if path == "/robots.txt":
+        return "text/plain", "User-agent: *\nAllow: /\n"
+    if path == "/":
+        links = "\n".join(
+            f'<li><a href="/page/{i}">Section {i}</a></li>' for i in range(pages)
+        )
+        body = f"<nav><ul>{links}</ul></nav><main><h1>Fixture Home</h1><p>Local load-test fixture.</p></main>"
+        title = "Fixture Home"
+    elif path.startswith("/page/"):
+        n = path.rsplit("/", 1)[-1]
+        paragraphs = "".join(
+            f"<p>Fixture page {n}, paragraph {i}: deterministic content for repeatable runs.</p>"
+            for i in range(8)
+        )
+        body = f"<main><h1>Page {n}</h1><h2>Overview</h2>{paragraphs}</main>"
+        title = f"Fixture Page {n}"
+    else:
+        return None, None
+    html = (
+        f'<html><head><title>{title}</title>'
+        f'<meta name="description" content="{title} description"></head>'
+        f"<body>{body}</body></html>"
+    )
+    return "text/html", html
+
+def start_fixture_server(pages, latency):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if latency:
+                time.sleep(latency)
+            content_type, content = fixture_page(self.path, pages)
+            if content is None:
+                self.send_error(404)
+                return
+            data = content.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+# -----------------------------
+# App Process
+# -----------------------------
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_app(workers, threads, state_dir):
+    port = free_port()
+    env = dict(
+        os.environ,
+        LLMS_MANIFEST_DIR=os.path.join(state_dir, "manifests"),
+        LLMS_STORAGE_STATE_DIR=os.path.join(state_dir, "storage_state"),
+        LLMS_RUNS_DIR=os.path.join(state_dir, "runs"),
+        LLMS_HOST_RATE="1000",
+        LLMS_HOST_BURST="1000",
+        PYTHONUNBUFFERED="1",
+    )
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--bind", f"127.0.0.1:{port}",
+         "--workers", str(workers), "--threads", str(threads), "--timeout", "600", "app:server"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(120):
+        if proc.poll() is not None:
+            raise RuntimeError("gunicorn exited during startup")
+        try:
+            if requests.get(base_url, timeout=1).status_code == 200:
+                return proc, base_url
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    stop_app(proc)
+    raise RuntimeError("App did not become ready")
+
+def stop_app(proc):
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+        proc.wait(timeout=30)
+    except Exception:
+        os.killpg(proc.pid, signal.SIGKILL)
+
+# -----------------------------
+# Resource Sampling
+# -----------------------------
+def process_table():
+    table = {}
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            with open(f"/proc/{pid}/cmdline", "rb") as f:
+                cmdline = f.read().replace(b"\0", b" ").decode("utf-8", "replace")
+            rss = 0
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        rss = int(line.split()[1]) * 1024
+                        break
+            table[int(pid)] = (ppid, cmdline, rss)
+        except (OSError, IndexError, ValueError):
+            continue
+    return table
+
+class ResourceSampler:
+    """Samples RSS of gunicorn workers and counts Chromium processes below the master."""
+
+    def __init__(self, master_pid, interval=0.5):
+        self.master_pid = master_pid
+        self.interval = interval
+        self.peak_worker_rss = 0
+        self.peak_total_rss = 0
+        self.peak_chromium = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            table = process_table()
+            children = {}
+            for pid, (ppid, _, _) in table.items():
+                children.setdefault(ppid, []).append(pid)
+            workers = children.get(self.master_pid, [])
+            total = 0
+            chromium = 0
+            stack = list(workers)
+            while stack:
+                pid = stack.pop()
+                _, cmdline, rss = table.get(pid, (0, "", 0))
+                total += rss
+                if "chrom" in cmdline or "headless_shell" in cmdline:
+                    chromium += 1
+                stack.extend(children.get(pid, []))
+            worker_rss = max((table[pid][2] for pid in workers if pid in table), default=0)
+            self.peak_worker_rss = max(self.peak_worker_rss, worker_rss)
+            self.peak_total_rss = max(self.peak_total_rss, total)
+            self.peak_chromium = max(self.peak_chromium, chromium)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+# -----------------------------
+# Dash Callback Scenarios
+# -----------------------------
+def dash_payload(outputs, inputs, state):
+    output_specs = [{"id": component_id, "property": prop} for component_id, prop in outputs]
+    if len(outputs) == 1:
+        output = f"{outputs[0][0]}.{outputs[0][1]}"
+        output_specs = output_specs[0]
+    else:
+        output = ".." + "...".join(f"{component_id}.{prop}" for component_id, prop in outputs) + ".."
+    return {
+        "output": output,
+        "outputs": output_specs,
+        "inputs": [{"id": component_id, "property": prop, "value": value} for component_id, prop, value in inputs],
+        "changedPropIds": [f"{inputs[0][0]}.{inputs[0][1]}"],
+        "state": [{"id": component_id, "property": prop, "value": value} for component_id, prop, value in state],
+    }
+
+def conversion_page_request(resp):
+    """Follow-up for the urls scenario: the first preview page of the returned run."""
+    run_id = resp.json()["response"]["conversion-run-id"]["data"]
+    return dash_payload(
+        [("converted-urls", "value")],
+        [("conversion-run-id", "data", run_id), ("converted-urls-page", "active_page", 1)],
+        [],
+    ), [r'"These results have expired', r"Run summary: [^\\]*\b[1-9]\d* (error|timeout)\b"]
+
+def build_scenarios(site_url, pages, urls_per_request):
+    page_links = [f"{site_url}/page/{i % pages}" for i in range(urls_per_request)]
+    # Each scenario is (payload, regexes that flag a failed callback in the response,
+    # optional follow-up that builds a second request from the first response)
+    return {
+        "navigation": (dash_payload(
+            [("nav-output", "value"), ("nav-output", "readOnly"), ("edit-nav-btn", "children"),
+             ("extract-nav-btn", "disabled"), ("edit-nav-btn", "disabled"), ("download-nav-btn", "disabled")],
+            [("extract-nav-btn", "n_clicks", 1), ("edit-nav-btn", "n_clicks", None)],
+            [("homepage-url", "value", site_url + "/"), ("age-gate-selector", "value", None),
+             ("cookie-selector", "value", None), ("root-nav-selector", "value", "nav"),
+             ("context-selector", "value", None), ("nav-output", "readOnly", True), ("nav-output", "value", None)],
+        ), [r'"Error', r'"No navigation structure found'], None),
+        "links": (dash_payload(
+            [("converted-links", "value")],
+            [("convert-links-btn", "n_clicks", 1)],
+            [("input-links", "value", "\n".join(f"[Page]({url})" for url in page_links))],
+        ), [r'"No valid links found'], None),
+        # Conversion results stay server-side; only the run id and pagination come back,
+        # so failures are read from the run summary on the first preview page
+        "urls": (dash_payload(
+            [("conversion-run-id", "data"), ("converted-urls-page", "max_value"),
+             ("converted-urls-page", "active_page"), ("converted-file-select", "value"),
+             ("download-md-btn", "disabled")],
+            [("convert-urls-btn", "n_clicks", 1)],
+            [("input-urls", "value", "\n".join(page_links)), ("url-convert-options", "value", []),
+             ("render-mode", "value", "off")],
+        ), [], conversion_page_request),
+    }
+
+def fire(session, app_url, scenario, timeout):
+    payload, error_markers, follow_up = scenario
+    started = time.monotonic()
+    try:
+        while True:
+            resp = session.post(f"{app_url}/_dash-update-component", json=payload, timeout=timeout)
+            if resp.status_code != 200 or any(re.search(marker, resp.text) for marker in error_markers):
+                return time.monotonic() - started, False
+            if follow_up is None:
+                return time.monotonic() - started, True
+            (payload, error_markers), follow_up = follow_up(resp), None
+    except (requests.RequestException, ValueError, KeyError):
+        return time.monotonic() - started, False
+
+def run_step(app_url, scenario, rate, duration, timeout):
+    """Open-loop load at a fixed arrival rate; returns latencies and outcomes."""
+    results = []
+    total = max(1, int(rate * duration))
+    local = threading.local()
+
+    def task():
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        results.append(fire(local.session, app_url, scenario, timeout))
+
+    with ThreadPoolExecutor(max_workers=max(4, int(rate * timeout))) as executor:
+        started = time.monotonic()
+        for i in range(total):
+            delay = started + i / rate - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(task)
+    return results
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+def summarize(results, rate, sampler):
+    latencies = [latency for latency, _ in results]
+    errors = sum(1 for _, ok in results if not ok)
+    return {
+        "rate": rate,
+        "requests": len(results),
+        "error_rate": errors / len(results) if results else 0.0,
+        "p50": percentile(latencies, 50),
+        "p90": percentile(latencies, 90),
+        "p99": percentile(latencies, 99),
+        "max": max(latencies, default=None),
+        "peak_worker_rss_mb": sampler.peak_worker_rss / 2 ** 20,
+        "peak_total_rss_mb": sampler.peak_total_rss / 2 ** 20,
+        "peak_chromium_processes": sampler.peak_chromium,
+    }
+
+# -----------------------------
+# Report
+# -----------------------------
+def capacity(steps, max_error_rate, max_p99):
+    """Highest tested rate that stayed within the error-rate and p99 targets."""
+    passing = [step["rate"] for step in steps
+               if step["error_rate"] <= max_error_rate and step["p99"] is not None and step["p99"] <= max_p99]
+    return max(passing, default=None)
+
+def format_seconds(value):
+    return f"{value:.2f}" if value is not None else "-"
+
+def format_report(report):
+    config = report["config"]
+    lines = [
+        f"Capacity report: {config['workers']} worker(s) x {config['threads']} thread(s), "
+        f"{config['duration']}s per step, target error rate <= {config['max_error_rate']:.0%}, "
+        f"p99 <= {config['max_p99']}s",
+        "",
+    ]
+    header = f"{'scenario':<11}{'rate/s':>8}{'reqs':>7}{'err%':>7}{'p50':>8}{'p90':>8}{'p99':>8}" \
+             f"{'worker MB':>11}{'total MB':>10}{'chromium':>10}"
+    for scenario, result in report["scenarios"].items():
+        lines.append(header)
+        for step in result["steps"]:
+            lines.append(
+                f"{scenario:<11}{step['rate']:>8g}{step['requests']:>7}{step['error_rate'] * 100:>7.1f}"
+                f"{format_seconds(step['p50']):>8}{format_seconds(step['p90']):>8}{format_seconds(step['p99']):>8}"
+                f"{step['peak_worker_rss_mb']:>11.0f}{step['peak_total_rss_mb']:>10.0f}"
+                f"{step['peak_chromium_processes']:>10}"
+            )
+        sustained = result["capacity_rate"]
+        lines.append(f"  -> sustained capacity: {sustained if sustained is not None else 'below lowest tested'} req/s")
+        lines.append("")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=1, help="gunicorn workers")
+    parser.add_argument("--threads", type=int, default=4, help="gunicorn threads per worker")
+    parser.add_argument("--scenarios", default="navigation,links,urls", help="comma-separated scenarios")
+    parser.add_argument("--rates", default="0.5,1,2,4", help="comma-separated request rates (req/s) to step through")
+    parser.add_argument("--duration", type=float, default=20, help="seconds per rate step")
+    parser.add_argument("--timeout", type=float, default=120, help="per-request timeout in seconds")
+    parser.add_argument("--pages", type=int, default=50, help="fixture pages")
+    parser.add_argument("--urls-per-request", type=int, default=20, help="URLs per Convert URLs request")
+    parser.add_argument("--fixture-latency", type=float, default=0.05, help="fixture response delay in seconds")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--max-p99", type=float, default=30)
+    parser.add_argument("--output", default="loadtest_report.json")
+    args = parser.parse_args()
+
+    rates = [float(rate) for rate in args.rates.split(",")]
+    fixture, site_url = start_fixture_server(args.pages, args.fixture_latency)
+    state_dir = tempfile.mkdtemp(prefix="llms-loadtest-")
+    proc, app_url = start_app(args.workers, args.threads, state_dir)
+    scenarios = build_scenarios(site_url, args.pages, args.urls_per_request)
+
+    report = {"config": vars(args), "scenarios": {}}
+    try:
+        for name in args.scenarios.split(","):
+            steps = []
+            for rate in rates:
+                print(f"Running {name} at {rate:g} req/s for {args.duration:g}s...", flush=True)
+                with ResourceSampler(proc.pid) as sampler:
+                    results = run_step(app_url, scenarios[name], rate, args.duration, args.timeout)
+                steps.append(summarize(results, rate, sampler))
+            report["scenarios"][name] = {
+                "steps": steps,
+                "capacity_rate": capacity(steps, args.max_error_rate, args.max_p99),
+            }
+    finally:
+        stop_app(proc)
+        fixture.shutdown()
+        shutil.rmtree(state_dir, ignore_errors=True)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print()
+    print(format_report(report))
+    print(f"Report written to {args.output}")
+
+if __name__ == "__main__":
+    main()